@@ -1,61 +1,182 @@
+import asyncio
 import csv
-import json
+import hashlib
+import itertools
 import os
 import random
+import time
 
 import discord
+import orjson
 from discord import app_commands
 from dotenv import load_dotenv
 
 load_dotenv()
 
+_rng = random.Random()
+
 class PairingBot(discord.Client):
     def __init__(self):
         intents = discord.Intents.default()
         super().__init__(intents=intents)
         self.tree = app_commands.CommandTree(self)
+        self.rankings = None
+        self.tournaments = None
+        self.conflicts = None
+        self.tournaments_display = ''
+        self.conflicts_display = ''
+        self._data_cached_at = float('-inf')
+        self._data_ttl = 5.0
+
+    async def get_data(self):
+        """Return (rankings, tournaments, conflicts), re-checking the files at most once per TTL"""
+        now = time.monotonic()
+        if now - self._data_cached_at >= self._data_ttl:
+            # Reload off the event loop, picking up any edits on disk
+            rankings, tournaments, conflicts = await asyncio.to_thread(load_data)
+            if self.tournaments is not None:
+                # Tournament and conflict names are registered as command choices at startup,
+                # so their key sets stay fixed until restart: added names are ignored and
+                # removed ones keep their last loaded data. Only the contents hot-reload.
+                tournaments = {k: tournaments.get(k, v) for k, v in self.tournaments.items()}
+                conflicts = {k: conflicts.get(k, v) for k, v in self.conflicts.items()}
+            self.rankings, self.tournaments, self.conflicts = rankings, tournaments, conflicts
+            self.tournaments_display = ', '.join(self.tournaments)
+            self.conflicts_display = ', '.join(self.conflicts)
+            self._data_cached_at = now
+        return self.rankings, self.tournaments, self.conflicts
 
     async def setup_hook(self):
+        await self.get_data()
+        self.tree.add_command(build_pairing_command(self.tournaments, self.conflicts))
+
         try:
             guild_id = os.getenv('GUILD_ID')
-            if guild_id:
-                guild = discord.Object(id=int(guild_id))
+            guild = discord.Object(id=int(guild_id)) if guild_id else None
+            if guild:
                 self.tree.clear_commands(guild=guild)
+
+            # Skip the REST round-trip when nothing changed since the last sync.
+            # Commands changed on Discord's side aren't detected; delete .command_hash to force a sync.
+            command_hash = command_tree_hash(self.tree, self.application_id, guild)
+            if command_hash == read_command_hash():
+                print("Commands unchanged since last sync, skipping sync")
+            elif guild:
                 print(f"Syncing commands to guild {guild_id}...")
                 await self.tree.sync(guild=guild)
+                write_command_hash(command_hash)
                 print(f"Commands synced successfully to guild {guild_id}")
             else:
                 print("No GUILD_ID set, syncing globally...")
                 await self.tree.sync()
+                write_command_hash(command_hash)
                 print("Commands synced globally")
         except Exception as e:
             print(f"Error during setup_hook: {e}")
             print("Bot will continue but commands may not be available")
 
+COMMAND_HASH_FILE = '.command_hash'
+
+def command_tree_hash(tree, application_id, guild=None):
+    """Hash the command payload that would be synced for the application and guild (or globally)"""
+    payload = {
+        'application': application_id,
+        'guild': guild.id if guild else None,
+        'commands': [c.to_dict() for c in tree.get_commands(guild=guild)]
+    }
+    return hashlib.blake2b(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+def read_command_hash():
+    try:
+        with open(COMMAND_HASH_FILE, 'r') as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+def write_command_hash(command_hash):
+    # The sync already succeeded, so failing to record it only costs a resync next start
+    try:
+        with open(COMMAND_HASH_FILE, 'w') as f:
+            f.write(command_hash)
+    except OSError as e:
+        print(f"Could not write {COMMAND_HASH_FILE}: {e}")
+
 bot = PairingBot()
 
+_RANKINGS_CACHE = {'mtime': 0, 'data': None}
+_TOURNAMENTS_CACHE = {'mtime': 0, 'data': None}
+_CONFLICTS_CACHE = {'mtime': 0, 'data': None}
+
+def _load_cached(path, cache, parse):
+    """Return the parsed contents of path, re-parsing only when its mtime changes"""
+    mtime = os.stat(path).st_mtime
+    if mtime != cache['mtime'] or cache['data'] is None:
+        cache['data'] = parse(path)
+        cache['mtime'] = mtime
+    return cache['data']
+
+def _parse_rankings(path):
+    # Parallel columns rather than a dict per debater; only 'names' is read downstream
+    with open(path, 'r', newline='') as f:
+        reader = csv.reader(f)
+        idx = {h: i for i, h in enumerate(next(reader))}
+        width = len(idx)
+        # Like DictReader, skip blank lines and pad short rows with None
+        rows = [
+            row + [None] * (width - len(row))
+            for row in itertools.islice(filter(None, reader), 50)
+        ]
+    return {
+        'names': [r[idx['Name']] for r in rows],
+        'ranks': [r[idx['Rank']] for r in rows],
+        'schools': [r[idx['School']] for r in rows],
+        'ratings': [r[idx['Rating']] for r in rows]
+    }
+
+def _parse_json(path):
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read())
+
+def _parse_tournaments(path):
+    tournaments = _parse_json(path)
+    # Entries are only used for membership tests
+    for data in tournaments.values():
+        if 'entries' in data:
+            data['entries'] = frozenset(data['entries'])
+    return tournaments
+
+def _parse_conflicts(path):
+    return {name: frozenset(judges) for name, judges in _parse_json(path).items()}
+
 def load_rankings():
-    debaters = []
-    with open('rankings.csv', 'r') as f:
-        reader = csv.DictReader(f)
-        for i, row in enumerate(reader):
-            if i >= 50:
-                break
-            debaters.append({
-                'rank': row['Rank'],
-                'school': row['School'],
-                'name': row['Name'],
-                'rating': row['Rating']
-            })
-    return debaters
+    return _load_cached('rankings.csv', _RANKINGS_CACHE, _parse_rankings)
 
 def load_tournaments():
-    with open('tournaments.json', 'r') as f:
-        return json.load(f)
+    return _load_cached('tournaments.json', _TOURNAMENTS_CACHE, _parse_tournaments)
 
 def load_conflicts():
-    with open('conflicts.json', 'r') as f:
-        return json.load(f)
+    return _load_cached('conflicts.json', _CONFLICTS_CACHE, _parse_conflicts)
+
+def load_data():
+    return load_rankings(), load_tournaments(), load_conflicts()
+
+# Discord rejects more choices than this per option at sync
+MAX_CHOICES = 25
+
+def build_choices(data):
+    """Build display/value choices once, capitalizing each name a single time"""
+    return [app_commands.Choice(name=name.capitalize(), value=name) for name in data]
+
+def apply_choices(param, choices):
+    """Offer choices statically, falling back to autocomplete past Discord's choice limit"""
+    if len(choices) <= MAX_CHOICES:
+        return app_commands.choices(**{param: choices})
+
+    async def autocomplete(interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+        current = current.lower()
+        return [c for c in choices if current in c.value.lower()][:MAX_CHOICES]
+
+    return app_commands.autocomplete(**{param: autocomplete})
 
 def select_judges(tournaments_data, conflicts_data, tournament, conflict_list=None, count=1):
     """Select random judges from a tournament, excluding conflicts"""
@@ -63,104 +184,77 @@ def select_judges(tournaments_data, conflicts_data, tournament, conflict_list=No
         available_tournaments = ', '.join(tournaments_data)
         raise ValueError(f"Tournament '{tournament}' not found. Available tournaments: {available_tournaments}")
 
-    available_judges = tournaments_data[tournament]["judges"].copy()
+    # random.sample never mutates its input, so the cached list can be used directly
+    available_judges = tournaments_data[tournament]["judges"]
 
     # Filter out conflicted judges
     if conflict_list and conflict_list in conflicts_data:
         conflicted_judges = conflicts_data[conflict_list]
-        available_judges = [j for j in available_judges if j not in conflicted_judges]
+        available_judges = tuple(j for j in available_judges if j not in conflicted_judges)
 
     if len(available_judges) < count:
         raise ValueError(f"Not enough non-conflicted judges available (need {count}, have {len(available_judges)})")
 
-    return random.sample(available_judges, count)
+    return _rng.sample(available_judges, count)
 
-async def tournament_autocomplete(
-    interaction: discord.Interaction,
-    current: str,
-) -> list[app_commands.Choice[str]]:
-    """Autocomplete function for tournament parameter"""
-    tournaments_data = load_tournaments()
-    return [
-        app_commands.Choice(name=tournament.capitalize(), value=tournament)
-        for tournament in tournaments_data
-        if current.lower() in tournament.lower()
-    ]
-
-async def conflicts_autocomplete(
-    interaction: discord.Interaction,
-    current: str,
-) -> list[app_commands.Choice[str]]:
-    """Autocomplete function for conflicts parameter"""
-    conflicts_data = load_conflicts()
-    return [
-        app_commands.Choice(name=conflict.capitalize(), value=conflict)
-        for conflict in conflicts_data
-        if current.lower() in conflict.lower()
-    ]
+async def send_error(interaction, message):
+    """Replace the deferred public response with an ephemeral error message"""
+    try:
+        await interaction.delete_original_response()
+    except discord.NotFound:
+        # Already deleted by an earlier error reply that then failed to send
+        pass
+    await interaction.followup.send(message, ephemeral=True)
 
 @bot.event
 async def on_ready():
     print(f'Logged in as {bot.user}')
 
-@bot.tree.command(name="generate-pairing", description="Generate a random debate pairing")
-
-@app_commands.describe(
-    panel="Whether to use a panel of 3 judges instead of 1",
-    tournament="Which tournament's competitors and judges to use",
-    conflicts="Which conflict list to apply"
-)
-
-@app_commands.autocomplete(
-    tournament=tournament_autocomplete,
-    conflicts=conflicts_autocomplete
-)
-
 async def generate_pairing(
     interaction: discord.Interaction,
-    panel: bool = False,
-    tournament: str = "emory",
-    conflicts: str = "om"
+    panel: bool,
+    tournament: str,
+    conflicts: str
 ):
+    """Handle /generate-pairing; options and their defaults are declared in build_pairing_command"""
+    # Acknowledge within Discord's 3 second window before doing any work
+    await interaction.response.defer(thinking=True)
+
     try:
-        # Load data once
-        rankings = load_rankings()
-        tournaments_data = load_tournaments()
-        conflicts_data = load_conflicts()
+        rankings, tournaments_data, conflicts_data = await bot.get_data()
 
         # Validate inputs
         if tournament not in tournaments_data:
-            await interaction.response.send_message(
-                f"Invalid tournament. Available: {', '.join(tournaments_data)}",
-                ephemeral=True
+            await send_error(
+                interaction,
+                f"Invalid tournament. Available: {bot.tournaments_display}"
             )
             return
 
         if conflicts not in conflicts_data:
-            await interaction.response.send_message(
-                f"Invalid conflict list. Available: {', '.join(conflicts_data)}",
-                ephemeral=True
+            await send_error(
+                interaction,
+                f"Invalid conflict list. Available: {bot.conflicts_display}"
             )
             return
 
         # Filter rankings to only include tournament entries
-        try:
-            tournaments_data[tournament]["entries"]
-            tournament_entries = set(tournaments_data[tournament]["entries"])
-            eligible_opponents = [r for r in rankings if r['name'] in tournament_entries]
-        except:
-            eligible_opponents = rankings
+        tournament_entries = tournaments_data[tournament].get("entries")
+        if tournament_entries is not None:
+            eligible_opponents = [n for n in rankings['names'] if n in tournament_entries]
+        else:
+            eligible_opponents = rankings['names']
 
         if not eligible_opponents:
-            await interaction.response.send_message(
-                "No eligible opponents found in both top 50 rankings and tournament entries.",
-                ephemeral=True
+            await send_error(
+                interaction,
+                "No eligible opponents found in both top 50 rankings and tournament entries."
             )
             return
 
         # Generate pairing
-        opponent = random.choice(eligible_opponents)
-        side = random.choice(['Aff', 'Neg'])
+        opponent = _rng.choice(eligible_opponents)
+        side = _rng.choice(['Aff', 'Neg'])
         opponent_side = 'Neg' if side == 'Aff' else 'Aff'
 
         # Select judges
@@ -168,26 +262,52 @@ async def generate_pairing(
         judges = select_judges(tournaments_data, conflicts_data, tournament, conflicts, judge_count)
 
         # Create and send embed
-        embed = discord.Embed(
-            title="Debate Pairing",
-            color=discord.Color.blue()
-        )
-        embed.add_field(name=side, value=interaction.user.name, inline=True)
-        embed.add_field(name=opponent_side, value=opponent['name'], inline=True)
-        embed.add_field(
-            name="Judges" if panel else "Judge",
-            value=", ".join(judges),
-            inline=False
-        )
-
-        await interaction.response.send_message(embed=embed)
+        embed = discord.Embed.from_dict({
+            'title': "Debate Pairing",
+            'color': discord.Color.blue().value,
+            'fields': [
+                {'name': side, 'value': interaction.user.name, 'inline': True},
+                {'name': opponent_side, 'value': opponent, 'inline': True},
+                {'name': "Judges" if panel else "Judge", 'value': ", ".join(judges), 'inline': False},
+            ]
+        })
+
+        await interaction.followup.send(embed=embed)
 
     except Exception as e:
         print(f"Error: {e}")
-        await interaction.response.send_message(
-            f"Error: {str(e)}",
-            ephemeral=True
-        )
+        try:
+            await send_error(
+                interaction,
+                f"Error: {str(e)}"
+            )
+        except discord.HTTPException as send_e:
+            print(f"Error sending error reply: {send_e}")
+
+def build_pairing_command(tournaments_data, conflicts_data):
+    """Build the generate-pairing command from the tournament and conflict names loaded at startup"""
+    @app_commands.command(name="generate-pairing", description="Generate a random debate pairing")
+
+    @app_commands.describe(
+        panel="Whether to use a panel of 3 judges instead of 1",
+        tournament="Which tournament's competitors and judges to use",
+        conflicts="Which conflict list to apply"
+    )
+
+    # Static choices are sent to Discord at sync time, so picking a value needs no round-trip
+    @apply_choices('tournament', build_choices(tournaments_data))
+    @apply_choices('conflicts', build_choices(conflicts_data))
+
+    async def generate_pairing_command(
+        interaction: discord.Interaction,
+        panel: bool = False,
+        tournament: str = "emory",
+        conflicts: str = "om"
+    ):
+        await generate_pairing(interaction, panel, tournament, conflicts)
+
+    return generate_pairing_command
 
 # Run the bot
-bot.run(os.getenv('DISCORD_TOKEN'))
+if __name__ == "__main__":
+    bot.run(os.getenv('DISCORD_TOKEN'))